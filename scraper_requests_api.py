@@ -10,11 +10,13 @@ https://search.mudah.my/v1/search?category=1020&from=0&include=extra_images%2Cbo
 🚀 'category=1020' stands for 'car'; if we choose another category, it will give a different value. 
 🚀 'from=0' stands for index 0. 
 🚀 'limit=200' stands for how much data we want to retrieve, with a maximum of 200.
+🚀 more than 200 rows are retrieved by requesting several 'from' offsets in parallel.
 """
 
 import logging
 import os
 import pickle
+from concurrent.futures import ThreadPoolExecutor
 from datetime import MAXYEAR, MINYEAR
 from typing import Annotated, Literal
 
@@ -24,8 +26,7 @@ from pydantic import (
     BaseModel,
     ConfigDict,
     Field,
-    SerializationInfo,
-    field_serializer,
+    ValidationError,
     model_serializer,
 )
 
@@ -37,6 +38,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 logger.setLevel(level=logging.INFO)
 
+SESSION = requests.Session()
+
 
 class CustomBaseModel(BaseModel):
     """
@@ -75,14 +78,6 @@ class AttributesModel(CustomBaseModel):
     ]
     mileage: MileageModel
 
-    @field_serializer("mileage")
-    def serialize_mileage(
-        self,
-        mileage: MileageModel,
-        _info: SerializationInfo,
-    ):
-        return f"{mileage.gte} - {mileage.lte}"
-
 
 class PostTypeModel(BaseModel):
     """
@@ -104,49 +99,86 @@ class ResponseModel(BaseModel):
     data: list[PostTypeModel]
 
 
-def main(
-    file_type: Literal["pickle", "csv"] = "csv",
-):
-    logger.info("✅  application started")
+API_URL = "https://search.mudah.my/v1/search"
+PAGE_SIZE = 200
+
 
+def fetch_page(offset: int, limit: int = PAGE_SIZE) -> list[dict]:
+    """
+    request a single page of up to limit rows, starting at the given offset
+    """
     query: dict[str, str | int] = {
         "category": 1020,
-        "from": 0,
+        "from": offset,
         "include": "extra_images,body",
-        "limit": 200,
+        "limit": limit,
         "type": "sell",
     }
+    try:
+        res = SESSION.get(
+            API_URL,
+            params=query,
+            timeout=30,
+        )
+        if res.status_code != 200:
+            message = f"❌  get request failed (from={offset})"
+            logger.error(message)
+            return []
+
+        message = f"✅  get request is successfull (from={offset})"
+        logger.info(message)
+        data = ResponseModel.model_validate_json(res.text)
+    except (requests.RequestException, ValidationError) as error:
+        message = f"❌  failed to fetch page (from={offset}): {error}"
+        logger.error(message)
+        return []
+
+    return data.model_dump(by_alias=True)["data"]
+
+
+def main(
+    file_type: Literal["pickle", "parquet"] = "parquet",
+    total: int = 1_000,
+    max_workers: int = 8,
+):
+    logger.info("✅  application started")
+
     logger.info("⚒️  requesting to mudah.my's API...")
-    res = requests.get(
-        "https://search.mudah.my/v1/search",
-        params=query,
-        timeout=30,
-    )
-    if res.status_code != 200:
-        logger.error("❌  get request failed")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        offsets = range(0, total, PAGE_SIZE)
+        limits = [min(PAGE_SIZE, total - offset) for offset in offsets]
+        pages = executor.map(fetch_page, offsets, limits)
+        dict_data = {"data": [post for page in pages for post in page]}
+
+    if not dict_data["data"]:
+        logger.error("❌  no data is retrieved")
         return
 
-    logger.info("✅  get request is successfull")
-    data_preview = f"🔎  preview of the data: {res.text[:35]}..."
+    data_preview = f"🔎  preview of the data: {dict_data['data'][0]}"
     logger.info(data_preview)
 
-    data = ResponseModel.model_validate_json(res.text)
-    dict_data = data.model_dump(by_alias=True)
+    # flatten mileage into mileage_gte/mileage_lte, then format it in one pass
+    df = pd.json_normalize(dict_data["data"], sep="_")
+    df["mileage"] = df.pop("mileage_gte") + " - " + df.pop("mileage_lte")
 
     match file_type:
-        case "csv":
-            # save tabular data to csv
-            logger.info("⚒️  saving to a csv file")
-            df = pd.DataFrame(dict_data["data"])
-            df.to_csv("data.csv", index=False)
-            message = f"✅  data is saved in {os.path.join(os.getcwd(), 'data.csv')}"
+        case "parquet":
+            # save tabular data to parquet
+            logger.info("⚒️  saving to a parquet file")
+            df.to_parquet(
+                "data.parquet",
+                engine="pyarrow",
+                compression="zstd",
+                index=False,
+            )
+            message = f"✅  data is saved in {os.path.join(os.getcwd(), 'data.parquet')}"
             logger.info(message)
 
         case "pickle":
             # save dict data to pickle
             logger.info("⚒️  saving to a pickle file")
             with open(file="data.pkl", mode="+wb") as file:
-                pickle.dump(dict_data, file=file)
+                pickle.dump({"data": df.to_dict(orient="records")}, file=file)
             message = f"✅  data is saved in {os.path.join(os.getcwd(), 'data.pkl')}"
             logger.info(message)
 
@@ -155,4 +187,4 @@ def main(
 
 
 if __name__ == "__main__":
-    main(file_type="csv")
+    main(file_type="parquet")
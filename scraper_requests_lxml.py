@@ -2,12 +2,12 @@ import logging
 import os
 import pickle
 from datetime import MAXYEAR, MINYEAR
-from typing import TYPE_CHECKING, Annotated, Literal
+from typing import Literal
 
+import msgspec
 import pandas as pd
 import requests
-from lxml import html
-from pydantic import AfterValidator, BaseModel, ConfigDict, Field, model_serializer
+from lxml import etree, html
 
 # setup logger
 logging.basicConfig(
@@ -17,81 +17,54 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 logger.setLevel(level=logging.INFO)
 
+SESSION = requests.Session()
 
-class CustomBaseModel(BaseModel):
-    """
-    custom base model class to replace base model class
-    """
-
-    model_config = ConfigDict(extra="ignore")
-
-
-class MileageModel(CustomBaseModel):
-    gte: int
-    lte: int
-
-    @model_serializer
-    def serialize_model(self) -> str:
-        return f"{self.gte} - {self.lte}"
-
-
-class AttributesModel(CustomBaseModel):
-    manufacturedYear: Annotated[
-        int,
-        Field(
-            gte=MINYEAR,
-            lte=MAXYEAR,
-            serialization_alias="manufactured_year",
-        ),
-    ]
-    mileage: MileageModel
-    modelName: str = Field(serialization_alias="model_name")
-    makeName: str = Field(serialization_alias="brand_name")
-    price: float
-
-
-class IntIdModel(CustomBaseModel):
-    attributes: AttributesModel
-
-
-def porcess(val: dict[int, IntIdModel]):
-    return list(val.values())
-
-
-CustomType2 = Annotated[IntIdModel, AfterValidator(lambda x: x.attributes)]
-ByID = Annotated[dict[int, CustomType2], AfterValidator(porcess)]
-
-
-class AdListingModel(CustomBaseModel):
-    byID: ByID
-
-    if TYPE_CHECKING:
-        byID: list[IntIdModel]  # type: ignore
-
-
-class InitialStateModel(CustomBaseModel):
-    adListing: AdListingModel
+# html parsing, fed with the raw response bytes
+HTML_PARSER = html.HTMLParser(encoding="utf-8")
+JSON_SCRIPT_XPATH = etree.XPath(
+    '//script[@type="application/json"]/text()',
+    smart_strings=False,
+)
 
 
-class PropsModel(CustomBaseModel):
-    initialState: InitialStateModel
+ATTRIBUTE_COLUMNS = {
+    "manufacturedYear": "manufactured_year",
+    "mileage": "mileage",
+    "modelName": "model_name",
+    "makeName": "brand_name",
+    "price": "price",
+}
 
 
-class JsonDataModel(CustomBaseModel):
-    props: PropsModel
+def parse_listing(raw_data: str | bytes) -> pd.DataFrame:
+    """
+    build the car listing table straight from the page json
+    """
+    by_id = msgspec.json.decode(raw_data)["props"]["initialState"]["adListing"]["byID"]
+    if not by_id:
+        return pd.DataFrame(columns=list(ATTRIBUTE_COLUMNS.values()))
+
+    # flatten mileage into mileage_gte/mileage_lte, then format it in one pass
+    df = pd.json_normalize([post["attributes"] for post in by_id.values()], sep="_")
+    df["mileage"] = (
+        df.pop("mileage_gte").astype(int).astype(str)
+        + " - "
+        + df.pop("mileage_lte").astype(int).astype(str)
+    )
+    df = df[list(ATTRIBUTE_COLUMNS)].rename(columns=ATTRIBUTE_COLUMNS)
+    df = df.astype({"manufactured_year": int, "price": float})
 
-    @model_serializer
-    def serialize_model(self):
-        return self.props.initialState.adListing.byID
+    # only keep cars with a valid manufactured year
+    return df[df["manufactured_year"].between(MINYEAR, MAXYEAR)]
 
 
 def main(
-    file_type: Literal["pickle", "csv"] = "csv",
+    file_type: Literal["pickle", "parquet"] = "parquet",
 ):
     logger.info("✅  application started")
     logger.info("⚒️  requesting to mudah.my's website...")
     # request
-    res = requests.get(
+    res = SESSION.get(
         "https://www.mudah.my/malaysia/cars-for-sale?o=1",
         timeout=30,
     )
@@ -100,35 +73,40 @@ def main(
         return
 
     # html docs
-    docs = html.fromstring(res.text)
+    docs = html.fromstring(res.content, parser=HTML_PARSER)
 
     # extract raw data
-    raw_data = docs.xpath(
-        """normalize-space(//script[@type="application/json"]/text())"""
-    )
-    raw_data = str(raw_data)
-
-    # expected raw_data is a string json
-    if not isinstance(raw_data, str):
+    raw_data = JSON_SCRIPT_XPATH(docs)
+
+    # expected raw_data to hold a json string
+    if (
+        not isinstance(raw_data, list)
+        or not raw_data
+        or not isinstance(raw_data[0], str)
+    ):
+        logger.error("❌  json data is not found in the html docs")
         return
 
-    # validate with pydantic
-    proper_data = JsonDataModel.model_validate_json(raw_data)
-    data = proper_data.model_dump(by_alias=True)
+    # decode with msgspec
+    df = parse_listing(raw_data[0])
 
     match file_type:
-        case "csv":
-            logger.info("⚒️  saving to a csv file")
-            df = pd.DataFrame(data)
-            df.to_csv("data.csv", index=False)
-            message = f"✅  data is saved in {os.path.join(os.getcwd(), 'data.csv')}"
+        case "parquet":
+            logger.info("⚒️  saving to a parquet file")
+            df.to_parquet(
+                "data.parquet",
+                engine="pyarrow",
+                compression="zstd",
+                index=False,
+            )
+            message = f"✅  data is saved in {os.path.join(os.getcwd(), 'data.parquet')}"
             logger.info(message)
 
         case "pickle":
             # save dict data to pickle
             logger.info("⚒️  saving to a pickle file")
             with open(file="data.pkl", mode="+wb") as file:
-                pickle.dump(data, file=file)
+                pickle.dump(df.to_dict(orient="records"), file=file)
             message = f"✅  data is saved in {os.path.join(os.getcwd(), 'data.pkl')}"
             logger.info(message)
 